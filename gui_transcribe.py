@@ -1,59 +1,147 @@
 """Gradio application for drag-and-drop transcription and optional summarization."""
 from __future__ import annotations
 
-import json
+import asyncio
+import hashlib
+import mimetypes
 import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import TYPE_CHECKING, BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-import gradio as gr
-from openai import OpenAI
+import orjson
+
+if TYPE_CHECKING:
+    import gradio as gr
+    from openai import AsyncOpenAI, OpenAI
 
 OUT_DIR = Path("out")
+SUMMARY_CACHE_DIR = OUT_DIR / ".sumcache"
 PROMPTS_PATH = Path("prompts.json")
 TRANSCRIPTION_MODEL = "whisper-1"
 SUMMARY_MODEL = "gpt-4o-mini"
+CHUNK_SECONDS = 300
+CHUNKING_MIN_SECONDS = 1800
+CHUNK_MIN_TAIL_SECONDS = 5.0
+CHUNK_CUT_SEARCH_SECONDS = 30.0
+SILENCE_NOISE_DB = -30
+SILENCE_MIN_SECONDS = 0.3
+CHUNK_MAX_CONCURRENCY = 4
+HTTP_TIMEOUT_SECONDS = 600.0
+HTTP_CONNECT_TIMEOUT_SECONDS = 5.0
+HTTP_CONNECT_RETRIES = 3
+MAX_UPLOAD_BYTES = 24 * 1024 * 1024
+SUPPORTED_AUDIO_SUFFIXES = frozenset(
+    {".flac", ".m4a", ".mp3", ".mp4", ".mpeg", ".mpga", ".oga", ".ogg", ".wav", ".webm"}
+)
+UI_CONCURRENCY_LIMIT = 4
+UI_QUEUE_SIZE = 32
+
+SUMMARY_SYSTEM_PROMPT = (
+    "You summarize audio transcripts. The TRANSCRIPT section comes first and the PROMPT section last. "
+    "Follow the instructions in the PROMPT section exactly and base every statement on the TRANSCRIPT "
+    "section. Do not invent details that are not in the transcript."
+)
+LEGACY_TRANSCRIPT_PLACEHOLDER = "{transcript}"
+CONDENSE_SYSTEM_PROMPT = (
+    "You condense one excerpt of a longer audio transcript into terse notes for a later summary. "
+    "List decisions, action items with owners, deadlines, open questions, and key facts or figures. "
+    "Use short bullet points, keep names and numbers verbatim, and omit small talk. "
+    "Keep the notes to at most about {word_budget} words and always finish the last bullet."
+)
+CONDENSE_MIN_TOKENS = 16_000
+CONDENSE_TARGET_TOKENS = 4_000
+CONDENSE_WINDOW_TOKENS = 2_000
+CONDENSE_MAX_WORKERS = 8
 
 DEFAULT_PROMPTS: Dict[str, str] = {
     "General Summary": (
         "You are an executive assistant. Provide 5-10 concise bullet points summarizing the conversation. "
-        "Focus on decisions, action items, deadlines, and unresolved questions. Include owners when possible.\n{transcript}"
+        "Focus on decisions, action items, deadlines, and unresolved questions. Include owners when possible."
     ),
     "LB Update (one line)": (
         "Produce a single-line status update no longer than 300 characters covering current status, blockers, "
-        "and the next planned step. Do not add bullet points or labels.\n{transcript}"
+        "and the next planned step. Do not add bullet points or labels."
     ),
     "Radiology Downtime (Ops)": (
         "Summarize the incident for hospital operations leadership. Highlight impact, timeline, workarounds, "
-        "communication points, and next actions. Keep it concise and actionable.\n{transcript}"
+        "communication points, and next actions. Keep it concise and actionable."
     ),
     "Land Listing Summary": (
         "Imagine you are briefing a buyer's agent about a new property listing. Provide the buyer persona, top "
-        "reasons to care, risks, next actions, and 3-5 attention-grabbing headlines (each 34 characters or fewer). "
-        "{transcript}"
+        "reasons to care, risks, next actions, and 3-5 attention-grabbing headlines (each 34 characters or fewer)."
     ),
 }
 
 
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write data beside path and rename it into place so readers never see a partial file."""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+_PROMPT_CACHE: Optional[Dict[str, str]] = None
+_PROMPT_STAMP: Optional[Tuple[int, int]] = None
+_PROMPT_LOCK = threading.RLock()
+
+
+def _prompt_stamp() -> Tuple[int, int]:
+    stat = PROMPTS_PATH.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _prompt_cache() -> Dict[str, str]:
+    """Return the in-memory prompt library, reloading it only when prompts.json changes."""
+    global _PROMPT_CACHE, _PROMPT_STAMP
+    with _PROMPT_LOCK:
+        if not PROMPTS_PATH.exists():
+            atomic_write_bytes(PROMPTS_PATH, orjson.dumps(DEFAULT_PROMPTS, option=orjson.OPT_INDENT_2))
+        stamp = _prompt_stamp()
+        if _PROMPT_CACHE is None or stamp != _PROMPT_STAMP:
+            data = orjson.loads(PROMPTS_PATH.read_bytes())
+            _PROMPT_CACHE = {str(k): str(v) for k, v in data.items()}
+            _PROMPT_STAMP = stamp
+        return _PROMPT_CACHE
+
+
 def ensure_prompt_library() -> Dict[str, str]:
     """Ensure the prompt library exists on disk and return its contents."""
-    if not PROMPTS_PATH.exists():
-        PROMPTS_PATH.write_text(json.dumps(DEFAULT_PROMPTS, indent=2), encoding="utf-8")
-    with PROMPTS_PATH.open("r", encoding="utf-8") as handle:
-        data = json.load(handle)
-    return {str(k): str(v) for k, v in data.items()}
+    return dict(_prompt_cache())
 
 
 def save_prompt(prompt_name: str, prompt_text: str) -> None:
-    prompts = ensure_prompt_library()
-    prompts[prompt_name] = prompt_text
-    PROMPTS_PATH.write_text(json.dumps(prompts, indent=2), encoding="utf-8")
-
-
-def load_prompt_text(prompt_name: str) -> str:
-    prompts = ensure_prompt_library()
+    global _PROMPT_CACHE, _PROMPT_STAMP
+    with _PROMPT_LOCK:
+        if _prompt_cache().get(prompt_name) == prompt_text:
+            return
+        prompts = ensure_prompt_library()
+        prompts[prompt_name] = prompt_text
+        atomic_write_bytes(PROMPTS_PATH, orjson.dumps(prompts, option=orjson.OPT_INDENT_2))
+        _PROMPT_CACHE = prompts
+        _PROMPT_STAMP = _prompt_stamp()
+
+
+def load_prompt_text(prompt_name: str, prompts: Optional[Dict[str, str]] = None) -> str:
+    if prompts is None:
+        prompts = _prompt_cache()
     return prompts.get(prompt_name, "")
 
 
@@ -64,18 +152,63 @@ def require_api_key() -> str:
     return api_key
 
 
+_client: Optional[OpenAI] = None
+_client_lock = threading.Lock()
+
+
+def _get_client() -> OpenAI:
+    """Return the shared OpenAI client so keep-alive connections are reused across requests."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            import httpx
+            from openai import DefaultHttpxClient, OpenAI
+
+            _client = OpenAI(
+                api_key=require_api_key(),
+                http_client=DefaultHttpxClient(
+                    transport=httpx.HTTPTransport(
+                        http2=True,
+                        retries=HTTP_CONNECT_RETRIES,
+                        limits=httpx.Limits(max_keepalive_connections=10),
+                    ),
+                    timeout=httpx.Timeout(HTTP_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS),
+                ),
+            )
+    return _client
+
+
 def timestamped_basename(source_path: Path) -> str:
     timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
     base = source_path.stem
-    return f"{base}-{timestamp}"
+    return f"{base}-{timestamp}-{uuid.uuid4().hex[:6]}"
 
 
 def seconds_to_srt_timestamp(seconds: float) -> str:
     millis = int(round(seconds * 1000))
-    hours, remainder = divmod(millis, 3_600_000)
-    minutes, remainder = divmod(remainder, 60_000)
-    secs, millis = divmod(remainder, 1000)
-    return f"{hours:02}:{minutes:02}:{secs:02},{millis:03}"
+    return (
+        f"{millis // 3_600_000:02}:{millis // 60_000 % 60:02}:"
+        f"{millis // 1000 % 60:02},{millis % 1000:03}"
+    )
+
+
+VECTORIZE_MIN_SEGMENTS = 64
+
+
+def srt_timestamps(seconds: Sequence[float]) -> List[str]:
+    """Format many offsets at once, using one NumPy pass for long transcripts."""
+    if len(seconds) < VECTORIZE_MIN_SEGMENTS:
+        return [seconds_to_srt_timestamp(value) for value in seconds]
+    import numpy as np
+
+    millis = np.rint(np.fromiter(seconds, dtype=np.float64, count=len(seconds)) * 1000).astype(np.int64)
+    hours, remainder = np.divmod(millis, 3_600_000)
+    minutes, remainder = np.divmod(remainder, 60_000)
+    secs, millis = np.divmod(remainder, 1000)
+    return [
+        "%02d:%02d:%02d,%03d" % parts
+        for parts in zip(hours.tolist(), minutes.tolist(), secs.tolist(), millis.tolist())
+    ]
 
 
 @dataclass
@@ -89,46 +222,381 @@ class TranscriptionOutputs:
     status_markdown: str
 
 
-def write_transcription_outputs(transcription: Dict, base_name: str) -> Tuple[str, Path, Path, Path]:
+def _segment_value(segment, key: str, default):
+    if isinstance(segment, dict):
+        return segment.get(key, default)
+    return getattr(segment, key, default)
+
+
+def write_transcription_outputs(
+    raw_json: bytes,
+    transcript_text: str,
+    segments: Iterable,
+    base_name: str,
+) -> Tuple[str, Path, Path, Path]:
     OUT_DIR.mkdir(parents=True, exist_ok=True)
-    transcript_text = transcription.get("text", "").strip()
+    transcript_text = transcript_text.strip()
 
     txt_path = OUT_DIR / f"{base_name}.txt"
-    txt_path.write_text(transcript_text + "\n", encoding="utf-8")
-
     json_path = OUT_DIR / f"{base_name}.json"
-    json_path.write_text(json.dumps(transcription, indent=2), encoding="utf-8")
-
-    srt_lines = []
-    segments = transcription.get("segments") or []
-    for idx, segment in enumerate(segments, start=1):
-        start_ts = seconds_to_srt_timestamp(float(segment.get("start", 0)))
-        end_ts = seconds_to_srt_timestamp(float(segment.get("end", 0)))
-        text = str(segment.get("text", "")).strip()
-        if not text:
-            continue
-        srt_lines.extend([str(idx), f"{start_ts} --> {end_ts}", text, ""])
-
     srt_path = OUT_DIR / f"{base_name}.srt"
-    srt_body = "\n".join(srt_lines).strip()
-    srt_path.write_text((srt_body + "\n") if srt_body else "", encoding="utf-8")
+
+    def _write_txt() -> None:
+        atomic_write_bytes(txt_path, (transcript_text + "\n").encode("utf-8"))
+
+    def _write_json() -> None:
+        atomic_write_bytes(json_path, raw_json)
+
+    def _write_srt() -> None:
+        cues = list(segments)
+        starts = srt_timestamps([float(_segment_value(segment, "start", 0)) for segment in cues])
+        ends = srt_timestamps([float(_segment_value(segment, "end", 0)) for segment in cues])
+        blocks = []
+        for idx, (segment, start_ts, end_ts) in enumerate(zip(cues, starts, ends), start=1):
+            text = str(_segment_value(segment, "text", "")).strip()
+            if not text:
+                continue
+            blocks.append(f"{idx}\n{start_ts} --> {end_ts}\n{text}\n")
+        atomic_write_bytes(srt_path, "\n".join(blocks).encode("utf-8"))
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        list(executor.map(lambda write: write(), (_write_txt, _write_json, _write_srt)))
 
     return transcript_text, txt_path, srt_path, json_path
 
 
+@lru_cache(maxsize=64)
+def _compile_prompt(prompt_template: str) -> str:
+    """Return the user-message suffix for a template; it is concatenated after the transcript."""
+    instructions = prompt_template.replace(LEGACY_TRANSCRIPT_PLACEHOLDER, "").strip()
+    return f"\n---\nPROMPT:\n{instructions}"
+
+
+def build_summary_input(prompt_template: str, transcript_text: str) -> List[Dict[str, str]]:
+    """Assemble the summary request with the transcript ahead of the per-prompt instructions.
+
+    OpenAI only caches prefixes of 1024+ tokens, so the long transcript has to come before the
+    instructions for different prompts run on the same transcript to share a cached prefix.
+    """
+    return [
+        {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": "TRANSCRIPT:\n" + transcript_text.strip() + _compile_prompt(prompt_template or ""),
+        },
+    ]
+
+
+def _condense_window(client: OpenAI, window_text: str, budget_tokens: int) -> str:
+    word_budget = max(40, budget_tokens * 3 // 4)
+    response = client.responses.create(
+        model=SUMMARY_MODEL,
+        input=[
+            {"role": "system", "content": CONDENSE_SYSTEM_PROMPT.format(word_budget=word_budget)},
+            {"role": "user", "content": window_text},
+        ],
+        # Safety cap only; the word budget in the instructions is what keeps notes short.
+        max_output_tokens=max(512, budget_tokens * 3),
+    )
+    return response.output_text.strip()
+
+
+def _condense(client: OpenAI, text: str, target_tokens: int = CONDENSE_TARGET_TOKENS) -> str:
+    """Map long transcripts to per-window notes so the final prompt stays near target_tokens."""
+    import tiktoken
+
+    encoding = tiktoken.encoding_for_model(SUMMARY_MODEL)
+    tokens = encoding.encode(text)
+    if len(tokens) <= CONDENSE_MIN_TOKENS:
+        return text
+
+    windows = [
+        encoding.decode(tokens[start : start + CONDENSE_WINDOW_TOKENS])
+        for start in range(0, len(tokens), CONDENSE_WINDOW_TOKENS)
+    ]
+    budget_tokens = target_tokens // len(windows)
+    with ThreadPoolExecutor(max_workers=min(CONDENSE_MAX_WORKERS, len(windows))) as executor:
+        partials = list(
+            executor.map(lambda window: _condense_window(client, window, budget_tokens), windows)
+        )
+    return "\n\n".join(
+        f"[Part {idx} of {len(partials)}]\n{partial}" for idx, partial in enumerate(partials, start=1)
+    )
+
+
+def _summary_cache_path(prompt_template: str, transcript_text: str) -> Path:
+    key_parts = (
+        SUMMARY_MODEL,
+        SUMMARY_SYSTEM_PROMPT,
+        CONDENSE_SYSTEM_PROMPT,
+        str(CONDENSE_MIN_TOKENS),
+        str(CONDENSE_WINDOW_TOKENS),
+        str(CONDENSE_TARGET_TOKENS),
+        prompt_template,
+        transcript_text,
+    )
+    digest = hashlib.blake2b("\0".join(key_parts).encode("utf-8")).hexdigest()[:32]
+    return SUMMARY_CACHE_DIR / f"{digest}.txt"
+
+
 def summarize_transcript(client: OpenAI, prompt_template: str, transcript_text: str) -> str:
     prompt_template = prompt_template or ""
-    cleaned_transcript = transcript_text.strip()
-    if "{transcript}" in prompt_template:
-        prompt = prompt_template.replace("{transcript}", cleaned_transcript)
-    else:
-        prompt = f"{prompt_template.strip()}\n\nTranscript:\n{cleaned_transcript}"
+    transcript_text = transcript_text.strip()
+    cache_path = _summary_cache_path(prompt_template, transcript_text)
+    if cache_path.exists():
+        return cache_path.read_text(encoding="utf-8")
 
     response = client.responses.create(
         model=SUMMARY_MODEL,
-        input=prompt,
+        input=build_summary_input(prompt_template, _condense(client, transcript_text)),
     )
-    return response.output_text.strip()
+    summary_text = response.output_text.strip()
+
+    if summary_text:
+        SUMMARY_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(cache_path, summary_text.encode("utf-8"))
+    return summary_text
+
+
+@contextmanager
+def audio_upload(file_path: Path) -> Iterator[Tuple[str, BinaryIO, str]]:
+    """Yield a (filename, handle, mime) upload tuple for the SDK.
+
+    A real file handle is kept on purpose: httpx sizes it via fstat for Content-Length and
+    streams it in 64 KiB reads, so the file is never held whole in memory.
+    """
+    mime_type = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+    with file_path.open("rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            raise RuntimeError(f"{file_path.name} is empty.")
+        yield file_path.name, handle, mime_type
+
+
+def probe_duration(file_path: Path) -> Optional[float]:
+    """Return the audio duration in seconds, or None when ffprobe is unavailable."""
+    if shutil.which("ffprobe") is None:
+        return None
+    result = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-show_entries",
+            "format=duration",
+            "-of",
+            "default=noprint_wrappers=1:nokey=1",
+            str(file_path),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        return None
+
+
+async def _extract_chunk(
+    file_path: Path, offset: float, length: float, chunk_path: Path, limiter: asyncio.Semaphore
+) -> None:
+    async with limiter:
+        process = await asyncio.create_subprocess_exec(
+            "ffmpeg",
+            "-v",
+            "error",
+            "-y",
+            "-ss",
+            str(offset),
+            "-t",
+            str(length),
+            "-i",
+            str(file_path),
+            "-vn",
+            "-ac",
+            "1",
+            str(chunk_path),
+        )
+        try:
+            returncode = await process.wait()
+        except asyncio.CancelledError:
+            process.kill()
+            await process.wait()
+            raise
+    if returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to split {file_path.name} at {offset:.0f}s.")
+
+
+async def _transcribe_chunk(client: AsyncOpenAI, chunk_path: Path, limiter: asyncio.Semaphore):
+    async with limiter:
+        with audio_upload(chunk_path) as audio_file:
+            return await client.audio.transcriptions.create(
+                model=TRANSCRIPTION_MODEL,
+                file=audio_file,
+                response_format="verbose_json",
+            )
+
+
+async def _gather_or_cancel(*coros) -> List:
+    """Like asyncio.gather, but cancel and await the remaining tasks as soon as one fails."""
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+async def _detect_silences(file_path: Path) -> List[Tuple[float, float]]:
+    """Return (start, end) spans that ffmpeg's silencedetect filter reports as quiet."""
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg",
+        "-hide_banner",
+        "-nostats",
+        "-i",
+        str(file_path),
+        "-vn",
+        "-af",
+        f"silencedetect=noise={SILENCE_NOISE_DB}dB:d={SILENCE_MIN_SECONDS}",
+        "-f",
+        "null",
+        "-",
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        _, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        process.kill()
+        await process.wait()
+        raise
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to scan {file_path.name} for silence.")
+
+    silences: List[Tuple[float, float]] = []
+    start: Optional[float] = None
+    for line in stderr.decode("utf-8", "replace").splitlines():
+        if "silence_start:" in line:
+            start = float(line.rsplit("silence_start:", 1)[1].split()[0])
+        elif "silence_end:" in line and start is not None:
+            silences.append((start, float(line.rsplit("silence_end:", 1)[1].split()[0])))
+            start = None
+    return silences
+
+
+def chunk_windows(duration: float, silences: Sequence[Tuple[float, float]] = ()) -> List[Tuple[float, float]]:
+    """Return (offset, length) windows covering duration, cutting inside silences near each mark.
+
+    Each cut goes to the middle of the longest silence within CHUNK_CUT_SEARCH_SECONDS of the
+    next CHUNK_SECONDS mark, so words are not split between chunks. Without a nearby silence
+    the cut falls back to the mark itself. A very short tail is folded into the last window.
+    """
+    offsets = [0.0]
+    while duration - offsets[-1] > CHUNK_SECONDS:
+        mark = offsets[-1] + CHUNK_SECONDS
+        low, high = mark - CHUNK_CUT_SEARCH_SECONDS, mark + CHUNK_CUT_SEARCH_SECONDS
+        nearby = [
+            (min(end, high) - max(start, low), (max(start, low) + min(end, high)) / 2)
+            for start, end in silences
+            if end > low and start < high
+        ]
+        offsets.append(max(nearby)[1] if nearby else mark)
+    if len(offsets) > 1 and duration - offsets[-1] < CHUNK_MIN_TAIL_SECONDS:
+        offsets.pop()
+    ends = offsets[1:] + [duration]
+    return [(offset, end - offset) for offset, end in zip(offsets, ends)]
+
+
+async def _transcribe_chunks(file_path: Path, duration: float) -> Tuple[bytes, str, List[Dict]]:
+    """Split long audio at silences, transcribe the pieces concurrently, and stitch the results."""
+    windows = chunk_windows(duration, await _detect_silences(file_path))
+    offsets = [offset for offset, _ in windows]
+    limiter = asyncio.Semaphore(CHUNK_MAX_CONCURRENCY)
+    with tempfile.TemporaryDirectory(prefix="transcribe-") as tmp_dir:
+        chunk_paths = [Path(tmp_dir) / f"chunk-{idx:04}.mp3" for idx in range(len(windows))]
+        await _gather_or_cancel(
+            *[
+                _extract_chunk(file_path, offset, length, path, limiter)
+                for (offset, length), path in zip(windows, chunk_paths)
+            ]
+        )
+        import httpx
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+        http_client = DefaultAsyncHttpxClient(
+            transport=httpx.AsyncHTTPTransport(http2=True, retries=HTTP_CONNECT_RETRIES),
+            timeout=httpx.Timeout(HTTP_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS),
+        )
+        async with AsyncOpenAI(api_key=require_api_key(), http_client=http_client) as client:
+            results = await _gather_or_cancel(
+                *[_transcribe_chunk(client, path, limiter) for path in chunk_paths]
+            )
+
+    texts = []
+    segments: List[Dict] = []
+    for offset, result in zip(offsets, results):
+        texts.append((result.text or "").strip())
+        for segment in getattr(result, "segments", None) or []:
+            segment = dict(segment) if isinstance(segment, dict) else segment.model_dump()
+            segment["id"] = len(segments)
+            segment["start"] = float(segment.get("start", 0)) + offset
+            segment["end"] = float(segment.get("end", 0)) + offset
+            segments.append(segment)
+
+    transcript_text = " ".join(text for text in texts if text)
+    stitched = {
+        "text": transcript_text,
+        "language": getattr(results[0], "language", None) if results else None,
+        "duration": duration,
+        "segments": segments,
+    }
+    return orjson.dumps(stitched, option=orjson.OPT_INDENT_2), transcript_text, segments
+
+
+def downsample_audio(file_path: Path, target_path: Path) -> Path:
+    """Re-encode audio as low-bitrate mono speech so it fits under the upload limit."""
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError(
+            f"{file_path.name} is larger than {MAX_UPLOAD_BYTES // (1024 * 1024)} MB and ffmpeg is not "
+            "installed to downsample it."
+        )
+    result = subprocess.run(
+        [
+            "ffmpeg",
+            "-v",
+            "error",
+            "-y",
+            "-i",
+            str(file_path),
+            "-vn",
+            "-ac",
+            "1",
+            "-ar",
+            "16000",
+            "-b:a",
+            "32k",
+            str(target_path),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to downsample {file_path.name}: {result.stderr.strip()}")
+    if target_path.stat().st_size > MAX_UPLOAD_BYTES:
+        raise RuntimeError(f"{file_path.name} is still too large to upload after downsampling.")
+    return target_path
+
+
+def _transcribe_single(client: OpenAI, file_path: Path) -> Tuple[bytes, str, List]:
+    with audio_upload(file_path) as audio_file:
+        transcription = client.audio.transcriptions.create(
+            model=TRANSCRIPTION_MODEL,
+            file=audio_file,
+            response_format="verbose_json",
+        )
+    raw_json = transcription.model_dump_json(indent=2).encode("utf-8")
+    return raw_json, transcription.text or "", getattr(transcription, "segments", None) or []
 
 
 def transcribe_file(
@@ -139,24 +607,30 @@ def transcribe_file(
     if not file_path:
         raise RuntimeError("Please upload an audio file to transcribe.")
 
-    api_key = require_api_key()
-    client = OpenAI(api_key=api_key)
-
     if not file_path.exists():
         raise RuntimeError("Uploaded file is unavailable. Please try again.")
 
+    if file_path.suffix.lower() not in SUPPORTED_AUDIO_SUFFIXES:
+        raise RuntimeError(
+            f"Unsupported file type '{file_path.suffix}'. "
+            f"Supported types: {', '.join(sorted(SUPPORTED_AUDIO_SUFFIXES))}."
+        )
+
+    client = _get_client()
     base_name = timestamped_basename(file_path)
 
-    with file_path.open("rb") as audio_file:
-        transcription = client.audio.transcriptions.create(
-            model=TRANSCRIPTION_MODEL,
-            file=audio_file,
-            response_format="verbose_json",
-        )
+    duration = probe_duration(file_path)
+    if duration is not None and duration > CHUNKING_MIN_SECONDS:
+        raw_json, transcript_text, segments = asyncio.run(_transcribe_chunks(file_path, duration))
+    elif file_path.stat().st_size > MAX_UPLOAD_BYTES:
+        with tempfile.TemporaryDirectory(prefix="transcribe-") as tmp_dir:
+            downsampled = downsample_audio(file_path, Path(tmp_dir) / f"{file_path.stem}.mp3")
+            raw_json, transcript_text, segments = _transcribe_single(client, downsampled)
+    else:
+        raw_json, transcript_text, segments = _transcribe_single(client, file_path)
 
-    transcription_dict = transcription.model_dump()
     transcript_text, txt_path, srt_path, json_path = write_transcription_outputs(
-        transcription_dict, base_name
+        raw_json, transcript_text, segments, base_name
     )
 
     summary_text = ""
@@ -182,7 +656,7 @@ def transcribe_file(
     )
 
 
-def transcribe_from_ui(
+async def transcribe_from_ui(
     audio_file,
     summarize: bool,
     prompt_name: str,
@@ -192,7 +666,7 @@ def transcribe_from_ui(
         return "⚠️ Please upload an audio file.", "", "", None, None, None, None
 
     try:
-        result = transcribe_file(Path(audio_file.name), summarize, prompt_text)
+        result = await asyncio.to_thread(transcribe_file, Path(audio_file.name), summarize, prompt_text)
     except Exception as exc:
         message = f"❌ {exc}"
         return message, "", "", None, None, None, None
@@ -208,24 +682,28 @@ def transcribe_from_ui(
     )
 
 
-def on_prompt_selected(prompt_name: str) -> Tuple[str, str]:
-    text = load_prompt_text(prompt_name) if prompt_name else ""
-    helper = ""
-    if text:
-        helper = f"Loaded prompt: **{prompt_name}**"
-    return text, helper
+PROMPT_SELECT_JS = """
+(name, prompts) => {
+    const text = (prompts || {})[name] || "";
+    return [text, text ? `Loaded prompt: **${name}**` : ""];
+}
+"""
 
 
-def on_prompt_save(prompt_name: str, prompt_text: str) -> str:
+def on_prompt_save(prompt_name: str, prompt_text: str):
+    import gradio as gr
+
     if not prompt_name:
-        return "❌ Please provide a prompt name."
+        return "❌ Please provide a prompt name.", gr.update()
     if not prompt_text.strip():
-        return "❌ Prompt text cannot be empty."
+        return "❌ Prompt text cannot be empty.", gr.update()
     save_prompt(prompt_name, prompt_text)
-    return f"✅ Saved prompt '{prompt_name}'."
+    return f"✅ Saved prompt '{prompt_name}'.", ensure_prompt_library()
 
 
 def build_interface() -> gr.Blocks:
+    import gradio as gr
+
     prompts = ensure_prompt_library()
     prompt_names = list(prompts.keys())
     initial_prompt_name = prompt_names[0] if prompt_names else ""
@@ -239,8 +717,8 @@ def build_interface() -> gr.Blocks:
 
         with gr.Row():
             audio_input = gr.File(
-                label="Audio file (mp3/wav/m4a)",
-                file_types=[".mp3", ".wav", ".m4a", ".mp4"],
+                label="Audio file (mp3/wav/m4a/flac/ogg/webm/mp4)",
+                file_types=sorted(SUPPORTED_AUDIO_SUFFIXES),
             )
             summarize_checkbox = gr.Checkbox(
                 label="Also summarize with selected prompt",
@@ -259,10 +737,11 @@ def build_interface() -> gr.Blocks:
         prompt_editor = gr.TextArea(
             label="Prompt editor",
             value=initial_prompt_text,
-            placeholder="Write or edit the prompt text here. Use {transcript} to insert the transcript.",
+            placeholder="Write or edit the prompt text here. The transcript is included automatically.",
             lines=10,
         )
         save_prompt_button = gr.Button("Save Prompt")
+        prompt_library = gr.JSON(value=prompts, visible=False)
 
         status = gr.Markdown("Ready.")
 
@@ -284,14 +763,15 @@ def build_interface() -> gr.Blocks:
             summary_download = gr.File(label="Download summary (.txt)")
 
         prompt_dropdown.change(
-            on_prompt_selected,
-            inputs=prompt_dropdown,
+            None,
+            inputs=[prompt_dropdown, prompt_library],
             outputs=[prompt_editor, prompt_status],
+            js=PROMPT_SELECT_JS,
         )
         save_prompt_button.click(
             on_prompt_save,
             inputs=[prompt_dropdown, prompt_editor],
-            outputs=prompt_status,
+            outputs=[prompt_status, prompt_library],
         )
         transcribe_button.click(
             fn=transcribe_from_ui,
@@ -312,6 +792,7 @@ def build_interface() -> gr.Blocks:
 
 def main() -> None:
     demo = build_interface()
+    demo.queue(default_concurrency_limit=UI_CONCURRENCY_LIMIT, max_size=UI_QUEUE_SIZE)
     demo.launch()
 
 
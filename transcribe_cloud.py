@@ -31,8 +31,8 @@ from gui_transcribe import ensure_prompt_library, load_prompt_text, transcribe_f
 )
 def main(audio_path: Path, summarize: bool, prompt_name: str, prompt_text: Optional[str]) -> None:
     """Transcribe AUDIO_PATH and save outputs under ./out/."""
-    ensure_prompt_library()
-    template = prompt_text if prompt_text is not None else load_prompt_text(prompt_name)
+    prompts = ensure_prompt_library()
+    template = prompt_text if prompt_text is not None else load_prompt_text(prompt_name, prompts)
 
     outputs = transcribe_file(audio_path, summarize, template)
 